@@ -1,75 +1,107 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import json
 import logging
 import os
 import re
 import subprocess
-from threading import Thread
+import time
+import urllib.error
 import urllib.request
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 
 DELIMITER = '---------------'
 
-LOG_FORMAT = r'%H;"%an %ae";"%cn %ce"'
-LOG_REGEXP = r'(\w+);"(.*?)";"(.*?)"'
-LOG_NAME_REGEXP = r'^(.*?)\s+(\S+)$'
+LOG_FORMAT = '%H%x1f%an%x1f%ae%x1f%cn%x1f%ce'
+LOG_FIELD_SEPARATOR = '\x1f'
+LOG_RECORD_SEPARATOR = b'\x00'
 
-GIT_EXTRACT_CMD = "git log --pretty='{}' --all".format(LOG_FORMAT)
-GIT_CLONE_CMD = "git clone {}"
+GIT_EXTRACT_ARGV = ['git', 'log', '-z', '--pretty=format:' + LOG_FORMAT, '--all']
+GIT_READ_CHUNK_SIZE = 64 * 1024
+# only commits metadata is used, so skip blobs and a working tree
+GIT_CLONE_ARGV = ['git', 'clone', '--bare', '--filter=blob:none', '--no-tags']
 
-GITHUB_USER_STATS = 'https://api.github.com/users/{}'
+GITHUB_URL = 'https://github.com/'
+GITHUB_COMMIT_API = 'https://api.github.com/repos/{}/commits/{}'
+GITHUB_TOKEN_ENV = 'GITHUB_TOKEN'
+GITHUB_AUTHOR_REGEXP = re.compile(rb'commits\?author=([^"]+)"')
 GITHUB_USER_REPOS = 'https://api.github.com/users/{}/repos?per_page=100&page={}'
-GITHUB_PER_PAGE_LIMIT = 100
+GITHUB_LAST_PAGE_REGEXP = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+GITHUB_REPOS_PAGES_WORKERS = 8
+GITHUB_RESOLVE_WORKERS = 16
+GITHUB_ASYNC_CONNECTIONS_LIMIT = 32
+GITHUB_MAX_RETRIES = 3
+GITHUB_RATE_LIMIT_CODES = (403, 429)
 
 SYSTEM_EMAILS = [
     'noreply@github.com',
 ]
 
 
-def get_public_repos_count(nickname):
-    url = GITHUB_USER_STATS
-    req_url = url.format(nickname)
-    req = urllib.request.Request(req_url)
-    try:
-        response = urllib.request.urlopen(req)
-    except Exception as e:
-        logging.debug(e)
-    else:
-        stats = json.loads((response.read().decode('utf8')))
-        repos_count = stats["public_repos"]
-        if repos_count:
-            return repos_count
+def get_github_repos_page(nickname, page_num):
+    req_url = GITHUB_USER_REPOS.format(nickname, page_num)
+    response, headers = Git.fetch(req_url, Git.get_api_headers())
+    if response is None:
+        logging.warning('Could not get page %s of %s GitHub repos', page_num, nickname)
+        return [], None
+
+    repos = json.loads((response.decode('utf8')))
+    return repos, headers.get('Link')
+
+
+def get_last_page(link_header):
+    extracted = GITHUB_LAST_PAGE_REGEXP.search(link_header or '')
+    if not extracted:
+        return 1
+
+    return int(extracted.group(1))
+
 
+def get_github_repos(nickname, only_forks=True):
+    repos, link_header = get_github_repos_page(nickname, 1)
+    pages = [repos]
+
+    # the first page tells how many pages there are, fetch the rest at once
+    last_page = get_last_page(link_header)
+    if last_page > 1:
+        with ThreadPoolExecutor(max_workers=GITHUB_REPOS_PAGES_WORKERS) as executor:
+            pages += executor.map(
+                lambda page_num: get_github_repos_page(nickname, page_num)[0],
+                range(2, last_page + 1),
+            )
 
-def get_github_repos(nickname, only_forks=True, repos_count=GITHUB_PER_PAGE_LIMIT):
     repos_links = set()
-    if not repos_count:
-        return repos_links
-    url = GITHUB_USER_REPOS
-    last_page = int(repos_count / GITHUB_PER_PAGE_LIMIT) + (repos_count % GITHUB_PER_PAGE_LIMIT > 0)
-    for page_num in range(1, last_page + 1):
-        req_url = url.format(nickname, page_num)
-        req = urllib.request.Request(req_url)
-        try:
-            response = urllib.request.urlopen(req)
-        except Exception as e:
-            logging.debug(e)
-        else:
-            repos = json.loads((response.read().decode('utf8')))
-            result = [r['html_url'] for r in repos if not only_forks or not r['fork']]
-            repos_links.update(set(result))
+    for repos in pages:
+        repos_links.update(r['html_url'] for r in repos if not only_forks or not r['fork'])
 
     return repos_links
 
 
 def find_all_repos_recursively(path):
     git_dirs = []
-    for current_dir, dirs, _ in os.walk(path):
+    dirs = [path]
+    while dirs:
+        current_dir = dirs.pop()
+        # don't descend into git dirs
         if current_dir.endswith('.git'):
             git_dirs.append(current_dir)
-            while dirs:
-                dirs.pop()
+            continue
+
+        try:
+            with os.scandir(current_dir) as entries:
+                subdirs = [e.path for e in entries if e.is_dir(follow_symlinks=False)]
+        except OSError as e:
+            logging.debug(e)
+            continue
+
+        dirs += reversed(subdirs)
 
     return git_dirs
 
@@ -78,29 +110,24 @@ class Commit:
     """
         Extract and store basic commit info
     """
-    @staticmethod
-    def _extract_name_email(log_str_part):
-        extracted = re.search(LOG_NAME_REGEXP, log_str_part)
-        if not extracted:
-            logging.error('Could not extract name/email from "%s"', log_str_part)
-            return ('', '')
-
-        return extracted.groups()
-
+    __slots__ = (
+        'hash', 'author', 'committer',
+        'author_name', 'author_email', 'committer_name', 'committer_email',
+        'author_committer_same',
+    )
 
     def __init__(self, log_str):
-        extracted = re.search(LOG_REGEXP, log_str)
-        if not extracted:
+        fields = log_str.split(LOG_FIELD_SEPARATOR)
+        if len(fields) != 5:
             logging.error('Could not commit info from "%s"', log_str)
         else:
-            self.hash, self.author, self.committer = extracted.groups()
-            self.author_name, self.author_email = Commit._extract_name_email(self.author)
-            self.committer_name, self.committer_email = Commit._extract_name_email(self.committer)
+            self.hash, self.author_name, self.author_email, self.committer_name, self.committer_email = fields
+            self.author = '{} {}'.format(self.author_name, self.author_email)
+            self.committer = '{} {}'.format(self.committer_name, self.committer_email)
 
-            self.author_committer_names_same = self.author_name == self.committer_name
-            self.author_committer_emails_same = self.author_email == self.committer_email
-
-            self.author_committer_same = self.author_committer_names_same and self.author_committer_emails_same
+            self.author_committer_same = (
+                self.author_name == self.committer_name and self.author_email == self.committer_email
+            )
 
 
     def __str__(self):
@@ -120,46 +147,208 @@ class Git:
     """
         Make external git work
     """
+    def __init__(self):
+        # set when GitHub API rate limit runs out while resolving usernames,
+        # commit pages are scraped since then
+        self.api_exhausted = False
+
     @staticmethod
     def get_tree_info(git_dir):
-        process = subprocess.Popen(GIT_EXTRACT_CMD, cwd=git_dir, shell=True, stdout=subprocess.PIPE)
-        stat = process.stdout.read().decode()
-        return stat
+        process = subprocess.Popen(GIT_EXTRACT_ARGV, cwd=git_dir, stdout=subprocess.PIPE)
+        # yield log records as soon as git emits them,
+        # decoding and splitting every chunk of complete records at once
+        tail = b''
+        for chunk in iter(lambda: process.stdout.read1(GIT_READ_CHUNK_SIZE), b''):
+            records, _, tail = (tail + chunk).rpartition(LOG_RECORD_SEPARATOR)
+            if records:
+                yield from records.decode().split(LOG_RECORD_SEPARATOR.decode())
+
+        if tail:
+            yield tail.decode()
+        process.wait()
 
     @staticmethod
-    def clone(link):
-        process = subprocess.Popen(GIT_CLONE_CMD.format(link), shell=True, stdout=subprocess.PIPE)
+    def clone(link, target_dir):
+        process = subprocess.Popen(GIT_CLONE_ARGV + ['--', link, target_dir], stdout=subprocess.PIPE)
         res = process.stdout.read().decode()
+        process.wait()
         return res
 
     @staticmethod
-    def get_verified_username(repo_url, commit, person):
-        if not repo_url.startswith('https://github.com/'):
+    def get_commit_link(repo_url, commit):
+        if not repo_url.startswith(GITHUB_URL):
             return
 
-        commit_link = repo_url.rstrip('/') + '/commit/' + commit.hash
-        req = urllib.request.Request(commit_link)
-        try:
-            response = urllib.request.urlopen(req)
-            page_source = response.read()
+        return repo_url.rstrip('/') + '/commit/' + commit.hash
 
-            # TODO: authored and committed
-            extracted = re.search(r'<a href=".+?commits\?author=(.+?)"', str(page_source))
-            if not extracted:
-                return
+    @staticmethod
+    def get_api_commit_link(repo_url, commit):
+        if not repo_url.startswith(GITHUB_URL):
+            return
 
-            name = extracted.groups(0)[0]
-            person.github_link = name
-            logging.debug(commit_link + '\n' + name)
+        repo_path = repo_url[len(GITHUB_URL):].strip('/')
+        if repo_path.endswith('.git'):
+            repo_path = repo_path[:-len('.git')]
+        if repo_path.count('/') != 1:
+            return
+
+        return GITHUB_COMMIT_API.format(repo_path, commit.hash)
+
+    @staticmethod
+    def get_api_headers():
+        headers = {'Accept': 'application/vnd.github+json'}
+        token = os.environ.get(GITHUB_TOKEN_ENV)
+        if token:
+            headers['Authorization'] = 'Bearer {}'.format(token)
+
+        return headers
+
+    @staticmethod
+    def extract_username(page_source):
+        if not page_source:
+            return
+
+        # TODO: authored and committed
+        extracted = GITHUB_AUTHOR_REGEXP.search(page_source)
+        if not extracted:
+            return
 
-        except Exception as e:
+        return extracted.group(1).decode()
+
+    @staticmethod
+    def extract_api_username(api_response):
+        if not api_response:
+            return
+
+        try:
+            data = json.loads(api_response.decode('utf8'))
+        except ValueError as e:
             logging.debug(e)
+            return
+
+        author = data.get('author') or {}
+        return author.get('login')
+
+    @staticmethod
+    def get_retry_delay(headers, attempt):
+        # retry only if GitHub asks to wait or still has quota left,
+        # an exhausted primary rate limit resets too late to wait for it
+        if not headers:
+            return
+
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            return int(retry_after) if retry_after.isdigit() else 2 ** attempt
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining and remaining != '0':
+            return 2 ** attempt
+
+    @staticmethod
+    def is_rate_limit_exhausted(headers):
+        return bool(headers) and headers.get('X-RateLimit-Remaining') == '0'
+
+    @staticmethod
+    def fetch(url, headers=None):
+        """
+            Returns response body (None on failure) and response headers
+        """
+        req = urllib.request.Request(url, headers=headers or {})
+        for attempt in range(GITHUB_MAX_RETRIES):
+            try:
+                response = urllib.request.urlopen(req)
+                return response.read(), response.headers
+            except urllib.error.HTTPError as e:
+                delay = None
+                if e.code in GITHUB_RATE_LIMIT_CODES and attempt + 1 < GITHUB_MAX_RETRIES:
+                    delay = Git.get_retry_delay(e.headers, attempt)
+                if delay is None:
+                    logging.debug(e)
+                    return None, e.headers
+                time.sleep(delay)
+            except Exception as e:
+                logging.debug(e)
+                return None, None
+
+    @staticmethod
+    async def fetch_async(session, url, headers=None):
+        """
+            Returns response body (None on failure) and response headers
+        """
+        for attempt in range(GITHUB_MAX_RETRIES):
+            try:
+                async with session.get(url, headers=headers) as response:
+                    delay = None
+                    if response.status in GITHUB_RATE_LIMIT_CODES and attempt + 1 < GITHUB_MAX_RETRIES:
+                        delay = Git.get_retry_delay(response.headers, attempt)
+                    if delay is None:
+                        if response.status >= 400:
+                            logging.debug('%s: HTTP %s', url, response.status)
+                            return None, response.headers
+                        return await response.read(), response.headers
+            except Exception as e:
+                logging.debug(e)
+                return None, None
+            await asyncio.sleep(delay)
+
+    def get_verified_username(self, repo_url, commit, person):
+        api_link = Git.get_api_commit_link(repo_url, commit)
+        if not api_link:
+            return
+
+        api_response = None
+        if not self.api_exhausted:
+            api_response, headers = Git.fetch(api_link, Git.get_api_headers())
+            if api_response is None and Git.is_rate_limit_exhausted(headers):
+                self.api_exhausted = True
+
+        if api_response is not None:
+            name = Git.extract_api_username(api_response)
+        else:
+            # fallback to the commit page scraping
+            page_source, _ = Git.fetch(Git.get_commit_link(repo_url, commit))
+            name = Git.extract_username(page_source)
+        if not name:
+            return
+
+        person.github_link = name
+        logging.debug(api_link + '\n' + name)
+
+    async def get_verified_username_async(self, session, api_semaphore, repo_url, commit, person):
+        api_link = Git.get_api_commit_link(repo_url, commit)
+        if not api_link:
+            return
+
+        api_response = None
+        async with api_semaphore:
+            # check only when it's our turn, earlier requests may have exhausted the limit
+            if not self.api_exhausted:
+                api_response, headers = await Git.fetch_async(session, api_link, Git.get_api_headers())
+                if api_response is None and Git.is_rate_limit_exhausted(headers):
+                    self.api_exhausted = True
+
+        if api_response is not None:
+            name = Git.extract_api_username(api_response)
+        else:
+            # fallback to the commit page scraping
+            page_source, _ = await Git.fetch_async(session, Git.get_commit_link(repo_url, commit))
+            name = Git.extract_username(page_source)
+        if not name:
+            return
+
+        person.github_link = name
+        logging.debug(api_link + '\n' + name)
 
 
 class Person:
     """
         Basic person info from commit
     """
+    __slots__ = (
+        'name', 'email', 'desc', 'as_author', 'as_committer',
+        'also_known', 'github_link', 'repo_url', 'commit',
+    )
+
     def __init__(self, desc):
         self.name = ''
         self.email = ''
@@ -168,21 +357,23 @@ class Person:
         self.as_committer = 0
         self.also_known = {}
         self.github_link = None
+        self.repo_url = None
+        self.commit = None
 
     def __str__(self):
-        result = "Name:\t\t\t{name}\nEmail:\t\t\t{email}".format(name=self.name, email=self.email)
+        result = ["Name:\t\t\t{name}\nEmail:\t\t\t{email}".format(name=self.name, email=self.email)]
         if self.as_author:
-            result += "\nAppears as author:\t{} times".format(self.as_author)
+            result.append("\nAppears as author:\t{} times".format(self.as_author))
         if self.as_committer:
-            result += "\nAppears as committer:\t{} times".format(self.as_committer)
+            result.append("\nAppears as committer:\t{} times".format(self.as_committer))
         if self.github_link:
-            result += "\nVerified account:\n\t\t\thttps://github.com/{}".format(self.github_link)
+            result.append("\nVerified account:\n\t\t\thttps://github.com/{}".format(self.github_link))
         if self.also_known:
-            result += '\nAlso appears with:{}'.format(
+            result.append('\nAlso appears with:{}'.format(
                 '\n\t\t\t'.join(['']+list(self.also_known.keys()))
-            )
+            ))
 
-        return result
+        return ''.join(result)
 
 
 class GitAnalyst:
@@ -198,111 +389,195 @@ class GitAnalyst:
         self.emails = {}
         self.repos = []
         self.same_emails_persons = {}
+        self._github_user_cache = {}
+        self._intern = {}
+        self._sorted_persons = None
 
-    def append(self, source=None):
-        if not source:
-            return
-
+    @staticmethod
+    def get_git_dir(source):
         if not '://' in source:
-            git_dir = source
-        else:
-            self.git.clone(source)
-            git_dir = source.split('/')[-1]
+            return source
+
+        git_dir = source.rstrip('/').split('/')[-1]
+        if not git_dir.endswith('.git'):
+            git_dir += '.git'
+        return git_dir
 
+    def fetch(self, source):
+        git_dir = self.get_git_dir(source)
+        if '://' in source:
+            self.git.clone(source, git_dir)
+
+        new_commits = [Commit(record) for record in self.git.get_tree_info(git_dir) if record]
+        return git_dir, new_commits
+
+    def ingest(self, source, git_dir, new_commits):
         self.repos.append(git_dir)
-        git_info = self.git.get_tree_info(git_dir)
-        text_commits = filter(lambda x: x, git_info.split('\n'))
-        new_commits = list(map(Commit, text_commits))
         self.commits += new_commits
 
         self.analyze(new_commits, source)
 
+    def append(self, source=None):
+        if not source:
+            return
+
+        self.ingest(source, *self.fetch(source))
+
+    def append_all(self, sources):
+        # sources with the same git dir would clone into and read it concurrently
+        unique_sources = {}
+        for source in sources:
+            if not source:
+                continue
+            key = os.path.normpath(self.get_git_dir(source))
+            if key in unique_sources:
+                logging.debug('Skipping %s, same git dir as %s', source, unique_sources[key])
+                continue
+            unique_sources[key] = source
+
+        sources = list(unique_sources.values())
+        if not sources:
+            return
+
+        # clone and read repos in parallel, merge results in the main thread
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for source, (git_dir, new_commits) in zip(sources, executor.map(self.fetch, sources)):
+                self.ingest(source, git_dir, new_commits)
+
     @property
     def sorted_persons(self):
-        return sorted(self.persons.items(), key=lambda p: p[1].as_author + p[1].as_committer)
+        if self._sorted_persons is None:
+            self._sorted_persons = sorted(self.persons.items(), key=lambda p: p[1].as_author + p[1].as_committer)
+
+        return self._sorted_persons
 
     def resolve_persons(self):
-        threads = []
-        for _, person in self.persons.items():
+        # request only one commit page per repo and email,
+        # skip the ones already resolved before
+        same_persons = {}
+        for person in self.persons.values():
             if person.email in SYSTEM_EMAILS:
                 continue
-            # TODO: optimize
-            thread = Thread(target=self.git.get_verified_username, args=(person.repo_url, person.commit, person))
-            thread.start()
-            threads.append(thread)
+            key = (person.repo_url, person.email.strip().lower())
+            if key in self._github_user_cache:
+                person.github_link = self._github_user_cache[key]
+                continue
+            same_persons.setdefault(key, []).append(person)
+
+        persons_to_resolve = [persons[0] for persons in same_persons.values()]
+        self._resolve(persons_to_resolve)
+
+        for key, persons in same_persons.items():
+            github_link = persons[0].github_link
+            # failed lookups may be transient, try them again next time
+            if github_link:
+                self._github_user_cache[key] = github_link
+            for person in persons[1:]:
+                person.github_link = github_link
 
-        for thread in threads:
-            thread.join()
+    def _resolve(self, persons_to_resolve):
+        # every resolving run starts with the GitHub API available
+        self.git.api_exhausted = False
+
+        if aiohttp:
+            asyncio.run(self.resolve_persons_async(persons_to_resolve))
+            return
+
+        with ThreadPoolExecutor(max_workers=GITHUB_RESOLVE_WORKERS) as executor:
+            list(executor.map(
+                lambda p: self.git.get_verified_username(p.repo_url, p.commit, p),
+                persons_to_resolve,
+            ))
+
+    async def resolve_persons_async(self, persons_to_resolve):
+        # one keep-alive connection pool for all GitHub requests
+        connector = aiohttp.TCPConnector(limit=GITHUB_ASYNC_CONNECTIONS_LIMIT)
+        api_semaphore = asyncio.Semaphore(GITHUB_ASYNC_CONNECTIONS_LIMIT)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*[
+                self.git.get_verified_username_async(session, api_semaphore, p.repo_url, p.commit, p)
+                for p in persons_to_resolve
+            ])
 
     def analyze(self, new_commits, repo_url):
-        # save all author and committers as unique persons
+        # save all author and committers as unique persons,
+        # link them and collect emails used for every name in a single pass
+        # TODO: probabilistic graph links based on same names/emails and Levenshtein distance
+        # just checking same names now
+        intern = self._intern.setdefault
         for commit in new_commits:
+            # keep one copy of every identity string for all commits and persons
+            commit.author = intern(commit.author, commit.author)
+            commit.author_name = intern(commit.author_name, commit.author_name)
+            commit.author_email = intern(commit.author_email, commit.author_email)
+            commit.committer = intern(commit.committer, commit.committer)
+            commit.committer_name = intern(commit.committer_name, commit.committer_name)
+            commit.committer_email = intern(commit.committer_email, commit.committer_email)
+
             # author saving
-            person = self.persons.get(commit.author, Person(commit.author))
-            person.name = commit.author_name
-            person.email = commit.author_email
-            person.as_author += 1
-            person.repo_url = repo_url
-            person.commit = commit
-            self.persons[commit.author] = person
+            author = self.persons.get(commit.author)
+            if author is None:
+                author = self.persons[commit.author] = Person(commit.author)
+            author.name = commit.author_name
+            author.email = commit.author_email
+            author.as_author += 1
+            author.repo_url = repo_url
+            author.commit = commit
 
             # committer saving
-            person = self.persons.get(commit.committer, Person(commit.committer))
-            person.name = commit.committer_name
-            person.email = commit.committer_email
-            person.as_committer += 1
-            person.repo_url = repo_url
-            person.commit = commit
-            self.persons[commit.committer] = person
-
-        # make persons graph links based on author/committer mismatch
-        for commit in new_commits:
+            committer = self.persons.get(commit.committer)
+            if committer is None:
+                committer = self.persons[commit.committer] = Person(commit.committer)
+            committer.name = commit.committer_name
+            committer.email = commit.committer_email
+            committer.as_committer += 1
+            committer.repo_url = repo_url
+            committer.commit = commit
+
+            # make persons graph links based on author/committer mismatch
             if not commit.author_committer_same:
-                self.persons[commit.author].also_known[commit.committer] = self.persons[commit.committer]
-                self.persons[commit.committer].also_known[commit.author] = self.persons[commit.author]
+                author.also_known[commit.committer] = committer
+                committer.also_known[commit.author] = author
 
-        # TODO: probabilistic graph links based on same names/emails and Levenshtein distance
-        # just checking same names now
-
-        for commit in new_commits:
-            author_emails = self.names.get(commit.author_name, set())
-            author_emails.add(commit.author_email)
-            self.names[commit.author_name] = author_emails
+            self.names.setdefault(commit.author_name, set()).add(commit.author_email)
+            self.names.setdefault(commit.committer_name, set()).add(commit.committer_email)
 
-            committer_emails = self.names.get(commit.committer_name, set())
-            committer_emails.add(commit.committer_email)
-            self.names[commit.committer_name] = committer_emails
+        # group names by the set of emails they use
+        groups = {}
+        for name, emails in self.names.items():
+            groups.setdefault(frozenset(emails), []).append(name)
 
-        for emails_set in self.names.values():
-            names = [name for name, v in self.names.items() if v == emails_set]
+        for emails_set, names in groups.items():
             key = ','.join(sorted(names))
             if len(names) > 1 and key not in self.same_emails_persons:
                 self.same_emails_persons[key] = (names, emails_set)
 
-        return self.sorted_persons
+        # persons stats changed, sort them again on demand
+        self._sorted_persons = None
 
     def __str__(self):
-        result = 'Analyze of the git repo(s) "{}"'.format(', '.join(self.repos))
+        result = ['Analyze of the git repo(s) "{}"'.format(', '.join(self.repos))]
 
-        result += '\nVerbose persons info:\n'
-        for name, person in self.sorted_persons:
-            result += ("{}\n{}\n".format(DELIMITER, person))
+        result.append('\nVerbose persons info:\n')
+        result.append(''.join(
+            "{}\n{}\n".format(DELIMITER, person) for name, person in self.sorted_persons
+        ))
 
-        matching_result = ''
-        for name, emails in self.names.items():
-            if len(emails) > 1:
-                matching_result += '\n{} is the owner of emails:\n\t\t\t{}\n'.format(name, '\n\t\t\t'.join(emails))
+        matching_result = [
+            '\n{} is the owner of emails:\n\t\t\t{}\n'.format(name, '\n\t\t\t'.join(emails))
+            for name, emails in self.names.items() if len(emails) > 1
+        ]
 
         if matching_result:
-            result += '\nMatching info:\n{}{}'.format(DELIMITER, matching_result)
+            result.append('\nMatching info:\n{}{}'.format(DELIMITER, ''.join(matching_result)))
 
         for names, emails in self.same_emails_persons.values():
-            result += '\n{} are the same person\n'.format(' and '.join(names))
+            result.append('\n{} are the same person\n'.format(' and '.join(names)))
 
-        result += '\nStatistics info:\n{}'.format(DELIMITER)
-        result += '\nTotal persons: {}'.format(len(self.persons))
+        result.append('\nStatistics info:\n{}'.format(DELIMITER))
+        result.append('\nTotal persons: {}'.format(len(self.persons)))
 
-        return result
+        return ''.join(result)
 
 
 def main():
@@ -313,7 +588,6 @@ def main():
     parser.add_argument('--nickname', type=str, help='try to download repos from all platforms by nickname')
     parser.add_argument('-r', '--recursive', action='store_true', help='recursive directory processing')
     parser.add_argument('--debug', action='store_true', help='print debug information')
-    # TODO: clone repos as bare
     # TODO: allow forks
 
     args = parser.parse_args()
@@ -333,13 +607,12 @@ def main():
         repos += dirs
 
     if args.nickname:
-        repos_count = get_public_repos_count(args.nickname)
-        if repos_count:
-            print('found', repos_count, 'repos')
-            repos += get_github_repos(args.nickname, repos_count=repos_count)
+        github_repos = get_github_repos(args.nickname)
+        if github_repos:
+            print('found', len(github_repos), 'non-fork repos to analyze')
+            repos += github_repos
 
-    for repo in repos:
-        analyst.append(source=repo)
+    analyst.append_all(repos)
 
     logging.info('Resolving GitHub usernames, please wait...')
     analyst.resolve_persons()